@@ -1,13 +1,27 @@
 # -*- coding: utf-8 -*-
 
+import ctypes
+import logging
+import mmap
+import os
+import resource
+import select
+import selectors
+import shlex
+import shutil
+import signal
+import sys
+import struct
 import subprocess
+import threading
 import time
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 # === Podesivo ===
-PY = "python3"
+# apsolutna putanja do interpretera — execve ne pretražuje PATH za svaki Popen
+PY = shutil.which("python3") or sys.executable
 START_DELAY_SEC = 100       # ← pauza između STARTOVA (ne čekamo završetak prethodne)
 TIMEOUT_EACH = 10 * 60
 MIN_BYTES = 100
@@ -15,130 +29,369 @@ STABILITY_CHECKS = 2
 STABILITY_SLEEP = 1.0
 MAX_WAIT_STABLE = 120
 RUN_EVERY_MIN = 60
+# limit paralelnih scraper procesa — ne zavisi od dužine SCRAPERS liste
+MAX_CONCURRENT = min(16, (os.cpu_count() or 4) * 2)
+
+# U kontejnerima nofile zna da bude ogroman (1M+) pa close_fds sweep u Popen-u
+# košta po spawn-u — skrešemo soft limit na razumnu vrednost.
+try:
+    _soft, _hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if _soft > 4096:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(4096, _hard), _hard))
+except Exception:
+    pass
 CONTINUOUS_MODE = True
 
+# Jedan logger za vruće status-linije (umesto print-a po liniji):
+# fajl + konzola, konfigurisan jednom pri importu.
+Path("logs").mkdir(exist_ok=True)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(message)s",
+    handlers=[logging.FileHandler("logs/run.log", encoding="utf-8"), logging.StreamHandler()],
+)
+log = logging.getLogger("run_all")
+
 # Redosled pokretanja = redosled u listi:
-SCRAPERS: List[Tuple[str, List[Path]]] = [
-    ("soccer.py",   [Path("soccer_sledeci_mecevi.txt"),   Path("soccer_mecevi_pregled.txt")]),
-    ("meridian.py", [Path("meridian_sledeci_mecevi.txt"), Path("meridian_mecevi_pregled.txt")]),
-    ("merkur.py",   [Path("merkur_sledeci_mecevi.txt"),   Path("merkur_mecevi_pregled.txt")]),
-    ("mozzart.py",  [Path("mozzart_sledeci_mecevi.txt"),  Path("mozzart_mecevi_pregled.txt")]),
-    ("betole.py",   [Path("betole_sledeci_mecevi.txt"),   Path("betole_mecevi_pregled.txt")]),
-    ("balkanbet.py",[Path("balkanbet_sledeci_mecevi.txt"),Path("balkanbet_mecevi_pregled.txt")]),
-    ("brazil.py",   [Path("brazil_sledeci_mecevi.txt"),   Path("brazil_mecevi_pregled.txt")]),
-    ("brazil_sutra.py", [Path("brazil_sutra_sledeci_mecevi.txt"), Path("brazil_sutra_mecevi_pregled.txt")]),
-    ("brazil_prekosutra.py", [Path("brazil_prekosutra_sledeci_mecevi.txt"), Path("brazil_prekosutra_mecevi_pregled.txt")]),
-    ("topbet.py",   [Path("topbet_sledeci_mecevi.txt"),   Path("topbet_mecevi_pregled.txt")]),
-    ("oktagon.py",  [Path("oktagonbet_sledeci_mecevi.txt"),  Path("oktagonbet_mecevi_pregled.txt")]),
+# Path objekti se prave jednom ovde — ne gradimo Path(script) po ciklusu.
+SCRAPERS: List[Tuple[Path, List[Path]]] = [
+    (Path("soccer.py"),   [Path("soccer_sledeci_mecevi.txt"),   Path("soccer_mecevi_pregled.txt")]),
+    (Path("meridian.py"), [Path("meridian_sledeci_mecevi.txt"), Path("meridian_mecevi_pregled.txt")]),
+    (Path("merkur.py"),   [Path("merkur_sledeci_mecevi.txt"),   Path("merkur_mecevi_pregled.txt")]),
+    (Path("mozzart.py"),  [Path("mozzart_sledeci_mecevi.txt"),  Path("mozzart_mecevi_pregled.txt")]),
+    (Path("betole.py"),   [Path("betole_sledeci_mecevi.txt"),   Path("betole_mecevi_pregled.txt")]),
+    (Path("balkanbet.py"),[Path("balkanbet_sledeci_mecevi.txt"),Path("balkanbet_mecevi_pregled.txt")]),
+    (Path("brazil.py"),   [Path("brazil_sledeci_mecevi.txt"),   Path("brazil_mecevi_pregled.txt")]),
+    (Path("brazil_sutra.py"), [Path("brazil_sutra_sledeci_mecevi.txt"), Path("brazil_sutra_mecevi_pregled.txt")]),
+    (Path("brazil_prekosutra.py"), [Path("brazil_prekosutra_sledeci_mecevi.txt"), Path("brazil_prekosutra_mecevi_pregled.txt")]),
+    (Path("topbet.py"),   [Path("topbet_sledeci_mecevi.txt"),   Path("topbet_mecevi_pregled.txt")]),
+    (Path("oktagon.py"),  [Path("oktagonbet_sledeci_mecevi.txt"),  Path("oktagonbet_mecevi_pregled.txt")]),
 ]
 
 MAIN_SCRIPT = "proba.py"
+_MAIN_SCRIPT_PATH = Path(MAIN_SCRIPT)
+_CWD = Path(".")
 MAIN_OUTPUTS = [Path("kvote_arbitraza_FULL.txt"), Path("kvote_arbitraza_ONLY_arbs.txt")]
 TARGET_PUSH = Path("kvote_arbitraza_FULL.txt")
 REPORT_DIR = Path("izvestaji")
 
 
 # =========== Pomoćne ===========
+def _kill_group(p: subprocess.Popen) -> None:
+    """Ubij celu procesnu grupu deteta (start_new_session=True)."""
+    try:
+        os.killpg(p.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        p.kill()
+
+def _tail_log(name: str, limit: int = 4096) -> None:
+    """Ispiši rep logs/<name>.out u glavni log — dijagnostika za pale skripte."""
+    try:
+        with open(f"logs/{name}.out", "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - limit))
+            tail = f.read().decode("utf-8", "replace").strip()
+    except OSError:
+        return
+    if tail:
+        log.info(f"[{name}] poslednji izlaz:\n{tail}")
+
 def fmt_duration(seconds: float) -> str:
     mins = int(seconds // 60)
     secs = seconds - mins * 60
     return f"{mins:02d}:{secs:05.2f}"
 
 def _run(cmd: list, check: bool = True) -> subprocess.CompletedProcess:
-    return subprocess.run(cmd, text=True, capture_output=True, check=check)
+    # bytes mode — bez TextIOWrapper dekodiranja; dekodira se samo ono što se ispisuje
+    return subprocess.run(cmd, capture_output=True, check=check)
 
+def _out(cp_stream: bytes) -> str:
+    return cp_stream.decode("utf-8", "replace").strip()
 
-# =========== GIT ===========
-def git_in_repo() -> bool:
-    try:
-        cp = _run(["git", "rev-parse", "--is-inside-work-tree"], check=False)
-        return cp.returncode == 0 and cp.stdout.strip() == "true"
-    except Exception:
-        return False
 
-def git_has_remote() -> bool:
+# =========== GIT ===========
+# repo i remote ne nastaju i ne nestaju dok daemon radi — proveri jednom,
+# pamti zauvek (uspeh i neuspeh), bez git fork-a u svakom narednom ciklusu
+_GIT_OK: Optional[bool] = None
+
+def git_preflight() -> bool:
+    """U repou smo i postoji remote — jedan shell poziv, keširan preko ciklusa."""
+    global _GIT_OK
+    if _GIT_OK is not None:
+        return _GIT_OK
     try:
-        cp = _run(["git", "remote"], check=False)
-        return bool(cp.stdout.strip())
+        cp = _run(["bash", "-c", "git rev-parse --is-inside-work-tree && git remote"], check=False)
+        out = _out(cp.stdout).splitlines()
+        _GIT_OK = cp.returncode == 0 and len(out) >= 2 and out[0] == "true"
     except Exception:
-        return False
+        _GIT_OK = False
+    return _GIT_OK
 
-def git_push_file(path: Path) -> None:
+def git_push_file(path: Path, now: Optional[datetime] = None) -> None:
     if not path.exists():
         print(f"[git] Preskačem push — ne postoji {path}")
         return
-    if not git_in_repo():
-        print("[git] Nisi u Git repou. Preskačem push.")
-        return
-    if not git_has_remote():
-        print("[git] Nema remote-a. Preskačem push.")
+    if not git_preflight():
+        print("[git] Nisi u Git repou ili nema remote-a. Preskačem push.")
         return
 
-    ts = datetime.now().strftime("%Y-%m-%d %H:%M")
+    ts = (now or datetime.now()).strftime("%Y-%m-%d %H:%M")
     try:
-        _run(["git", "add", str(path)], check=False)
         msg = f"auto: update {path.name} @ {ts}"
-        cp_commit = _run(["git", "commit", "-m", msg], check=False)
-        if cp_commit.returncode != 0:
+        qpath = shlex.quote(str(path))
+        # "ima li promena" se ne čita iz teksta poruke (zavisi od locale-a i
+        # git-ove formulacije) nego iz exit koda: add pa diff --cached --quiet
+        # nad tim fajlom — 0 znači da nema šta da se commit-uje.
+        cmd = (
+            f"git add {qpath} && "
+            f"if git diff --cached --quiet -- {qpath}; then exit 42; fi && "
+            f"git commit -m {shlex.quote(msg)} && git push"
+        )
+        cp = _run(["bash", "-c", cmd], check=False)
+        if cp.returncode == 0:
+            print(f"[git] Commit ok: {msg}")
+            print("[git] Push uspešan.")
+        elif cp.returncode == 42:
             print(f"[git] Nema promena za commit ({path.name}).")
-            return
-        print(f"[git] Commit ok: {msg}")
-        cp_push = _run(["git", "push"], check=False)
-        if cp_push.returncode != 0:
-            print(f"[git] PUSH FAIL:\n{cp_push.stderr.strip()}")
         else:
-            print("[git] Push uspešan.")
+            combined = _out(cp.stdout) + "\n" + _out(cp.stderr)
+            print(f"[git] PUSH FAIL:\n{combined.strip()}")
     except Exception as e:
         print(f"[git] Greška: {e}")
 
 
 # =========== Stabilnost fajla ===========
+# inotify preko libc — jedan watcher za sve izlazne fajlove umesto
+# pojedinačnih stat() petlji po fajlu.
+_IN_MODIFY      = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_CREATE      = 0x00000100
+_IN_MOVED_TO    = 0x00000080
+_IN_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_CREATE | _IN_MOVED_TO
+
+try:
+    _LIBC = ctypes.CDLL(None, use_errno=True)
+    _HAS_INOTIFY = hasattr(_LIBC, "inotify_init1")
+except Exception:
+    _LIBC = None
+    _HAS_INOTIFY = False
+
+def _inotify_open(dirpath: Path) -> Optional[int]:
+    """Vrati inotify fd sa watch-om na direktorijumu, ili None ako ne može."""
+    if not _HAS_INOTIFY:
+        return None
+    try:
+        fd = _LIBC.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        wd = _LIBC.inotify_add_watch(fd, str(dirpath).encode(), _IN_MASK)
+        if wd < 0:
+            os.close(fd)
+            return None
+        return fd
+    except Exception:
+        return None
+
+def _inotify_read_names(fd: int) -> set:
+    """Pročitaj sve dostupne evente i vrati imena fajlova koja su se menjala."""
+    names = set()
+    try:
+        buf = os.read(fd, 65536)
+    except BlockingIOError:
+        return names
+    except OSError:
+        return names
+    offset = 0
+    while offset + 16 <= len(buf):
+        _wd, _mask, _cookie, name_len = struct.unpack_from("iIII", buf, offset)
+        offset += 16
+        if name_len:
+            name = buf[offset:offset + name_len].split(b"\x00", 1)[0]
+            if name:
+                names.add(name.decode("utf-8", "replace"))
+            offset += name_len
+    return names
+
+def wait_for_files_stable(
+    paths: List[Path],
+    min_bytes: int = MIN_BYTES,
+    checks: int = STABILITY_CHECKS,
+    sleep_s: float = STABILITY_SLEEP,
+    max_wait: int = MAX_WAIT_STABLE,
+    fast: Optional[set] = None,
+) -> Dict[Path, bool]:
+    """
+    Sačekaj stabilnost SVIH fajlova odjednom preko jednog inotify watcher-a:
+    fajl je stabilan kad postoji, ima >= min_bytes i nema novih write eventova
+    u poslednjih checks * sleep_s sekundi. Pada nazad na wait_for_file_stable
+    po fajlu ako inotify nije dostupan.
+
+    Fajlovi u 'fast' skupu dolaze od procesa koji su već čisto izašli — pisac
+    više ne postoji, pa je dovoljan jedan stat() umesto čekanja na tišinu.
+    """
+    results: Dict[Path, bool] = {}
+    if fast:
+        remaining = []
+        for p in paths:
+            if p not in fast:
+                remaining.append(p)
+                continue
+            try:
+                size = p.stat().st_size
+            except OSError:
+                log.info(f"[!] Fajl {p} nije nastao u roku.")
+                results[p] = False
+                continue
+            if size >= min_bytes:
+                log.info(f"[OK] Fajl {p} je stabilan ({size} bytes).")
+                results[p] = True
+            else:
+                log.info(f"[!] Fajl {p} je premali ({size} < {min_bytes}). Preskačem.")
+                results[p] = False
+        paths = remaining
+        if not paths:
+            return results
+    fd = _inotify_open(_CWD)
+    if fd is None:
+        results.update({p: wait_for_file_stable(p, min_bytes, checks, sleep_s, max_wait) for p in paths})
+        return results
+
+    quiet_for = checks * sleep_s
+    deadline = time.time() + max_wait
+    pending = {p.name: p for p in paths}
+    last_event: Dict[str, float] = {}
+
+    try:
+        now = time.time()
+        for name in pending:
+            last_event[name] = now
+
+        while pending and time.time() < deadline:
+            timeout = min(sleep_s, max(0.0, deadline - time.time()))
+            ready, _, _ = select.select([fd], [], [], timeout)
+            now = time.time()
+            if ready:
+                for name in _inotify_read_names(fd):
+                    if name in pending:
+                        last_event[name] = now
+
+            # fajlovi bez eventova u quiet_for prozoru → proveri i skini sa liste
+            for name in list(pending):
+                if now - last_event[name] < quiet_for:
+                    continue
+                p = pending[name]
+                try:
+                    size = p.stat().st_size
+                except OSError:
+                    last_event[name] = now  # još ne postoji — čekaj dalje
+                    continue
+                if size >= min_bytes:
+                    log.info(f"[OK] Fajl {p} je stabilan ({size} bytes).")
+                    results[p] = True
+                else:
+                    log.info(f"[!] Fajl {p} je premali ({size} < {min_bytes}). Preskačem.")
+                    results[p] = False
+                del pending[name]
+
+        for name, p in pending.items():
+            log.info(f"[!] Fajl {p} nije postao stabilan u roku.")
+            results[p] = False
+    finally:
+        os.close(fd)
+    return results
+
+
+def _wait_quiescent(path: Path, min_bytes: int, quiet_for: float, deadline: float) -> Optional[bool]:
+    """
+    Čekaj da fajl »utihne« preko inotify-ja: stabilan je kad nema write eventova
+    quiet_for sekundi i ima >= min_bytes. Vraća True/False, ili None ako inotify
+    nije dostupan (poziva se stari stat-poll fallback).
+    """
+    fd = _inotify_open(path.parent if path.parent != Path("") else _CWD)
+    if fd is None:
+        return None
+    try:
+        name = path.name
+        last_event = time.time()
+        while time.time() < deadline:
+            timeout = min(quiet_for, max(0.0, deadline - time.time()))
+            ready, _, _ = select.select([fd], [], [], timeout)
+            now = time.time()
+            if ready and name in _inotify_read_names(fd):
+                last_event = now
+                continue
+            if now - last_event < quiet_for:
+                continue
+            try:
+                size = path.stat().st_size
+            except OSError:
+                last_event = now  # još nije nastao — čekaj dalje
+                continue
+            if size >= min_bytes:
+                return True
+            last_event = now  # postoji ali je premali — možda tek počinje upis
+        return False
+    finally:
+        os.close(fd)
+
+
 def wait_for_file_stable(
-    path: Path, 
+    path: Path,
     min_bytes: int = MIN_BYTES,
-    checks: int = STABILITY_CHECKS, 
+    checks: int = STABILITY_CHECKS,
     sleep_s: float = STABILITY_SLEEP,
-    max_wait: int = MAX_WAIT_STABLE
+    max_wait: int = MAX_WAIT_STABLE,
+    # vezano kao default argumenti — LOAD_FAST umesto LOAD_GLOBAL+LOAD_ATTR
+    # u svakom krugu polling fallback-a
+    _time=time.time,
+    _sleep=time.sleep,
 ) -> bool:
-    start_time = time.time()
+    start_time = _time()
     deadline = start_time + TIMEOUT_EACH
     max_stable_wait = start_time + max_wait
-    
-    # 1) čekaj nastanak
-    while time.time() < deadline:
-        if path.exists():
-            break
-        time.sleep(0.5)
-    else:
-        print(f"[!] Fajl {path} nije nastao u roku.")
-        return False
-    
-    # 2) min veličina
-    size_deadline = time.time() + max_wait
-    while time.time() < size_deadline and time.time() < deadline:
-        try:
-            size = path.stat().st_size
-            if size >= min_bytes:
-                break
-        except OSError:
-            pass
-        time.sleep(0.5)
-    else:
+
+    # inotify put: blokiraj dok upis ne utihne, umesto stat() na svaki tick
+    res = _wait_quiescent(path, min_bytes, checks * sleep_s, max_stable_wait)
+    if res is not None:
+        if res:
+            log.info(f"[OK] Fajl {path} je stabilan ({path.stat().st_size} bytes).")
+        else:
+            log.info(f"[!] Fajl {path} nije postao stabilan u roku.")
+        return res
+
+    stat = path.stat
+
+    # 1+2) nastanak i min veličina u jednom prolazu — jedan stat() po krugu
+    # umesto exists() pa stat(); rok za veličinu teče od prvog pojavljivanja
+    size = -1
+    size_deadline = None
+    while _time() < deadline:
         try:
-            final_size = path.stat().st_size
-            print(f"[!] Fajl {path} je premali ({final_size} < {min_bytes}). Preskačem.")
+            size = stat().st_size
         except OSError:
-            print(f"[!] Fajl {path} nije dostupan.")
+            _sleep(0.5)
+            continue
+        if size_deadline is None:
+            size_deadline = _time() + max_wait
+        if size >= min_bytes or _time() >= size_deadline:
+            break
+        _sleep(0.5)
+    if size < 0:
+        log.info(f"[!] Fajl {path} nije nastao u roku.")
+        return False
+    if size < min_bytes:
+        log.info(f"[!] Fajl {path} je premali ({size} < {min_bytes}). Preskačem.")
         return False
     
     # 3) stabilnost
     last_size = None
     stable_count = 0
-    while stable_count < checks and time.time() < max_stable_wait and time.time() < deadline:
+    while stable_count < checks and _time() < max_stable_wait and _time() < deadline:
         try:
-            current_size = path.stat().st_size
+            current_size = stat().st_size
         except OSError:
-            print(f"[!] Greška pri čitanju {path}.")
+            log.info(f"[!] Greška pri čitanju {path}.")
             return False
         
         if last_size is None:
@@ -150,152 +403,364 @@ def wait_for_file_stable(
             stable_count = 0
         
         if stable_count < checks:
-            time.sleep(sleep_s)
+            _sleep(sleep_s)
     
     if stable_count >= checks:
-        print(f"[OK] Fajl {path} je stabilan ({last_size} bytes).")
+        log.info(f"[OK] Fajl {path} je stabilan ({last_size} bytes).")
         return True
     else:
-        print(f"[!] Fajl {path} nije postao stabilan u roku.")
+        log.info(f"[!] Fajl {path} nije postao stabilan u roku.")
         return False
 
 
 # =========== Pokretanje scraper-a sa pauzom između STARTOVA ===========
-def run_scrapers_staggered(scrapers: List[Tuple[str, List[Path]]]) -> None:
+def run_scrapers_staggered(scrapers: List[Tuple[Path, List[Path]]]) -> None:
     """
-    1) Skripte STARTUJEMO redom sa pauzom START_DELAY_SEC između startova.
+    1) Svaka skripta dobija ZAKAZANO vreme starta (i * START_DELAY_SEC) — pauza
+       između startova je očuvana, a petlja za to vreme reap-uje ranije pokrenute
+       procese i proverava stabilnost njihovih izlaza.
     2) Ne čekamo da se prethodna završi — sve rade paralelno nakon što su pokrenute.
-    3) Posle što su SVE startovane, prikupljamo rezultate i merimo trajanja.
+    3) Izlaz svakog deteta ide direktno u logs/<skripta>.out; rep fajla se ispisuje
+       u log samo kad skripta padne.
     """
-    procs: Dict[str, subprocess.Popen] = {}
-    starts: Dict[str, float] = {}
-    outputs_map: Dict[str, List[Path]] = {}
-
-    # STARTUJ sve, sa pauzom između startova
-    for idx, (script, outputs) in enumerate(scrapers, start=1):
-        if not Path(script).exists():
-            print(f"[!] Preskačem — ne postoji {script}")
-        else:
-            print(f"[*] START {idx}/{len(scrapers)}: {script}")
-            try:
-                p = subprocess.Popen([PY, script], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-                procs[script] = p
-                starts[script] = time.time()
-                outputs_map[script] = outputs
-            except Exception as e:
-                print(f"[!] Greška pri startovanju {script}: {e}")
-
-        # pauza osim posle poslednjeg starta
-        if idx < len(scrapers):
-            print(f"[*] Pauza {START_DELAY_SEC}s pre narednog START-a...")
-            time.sleep(START_DELAY_SEC)
-
-    # SADA prikupljamo rezultate za sve pokrenute procese
-    for script, p in procs.items():
+    procs: Dict[Path, subprocess.Popen] = {}
+    starts: Dict[Path, float] = {}
+    outputs_map: Dict[Path, List[Path]] = {}
+
+    # raspored startova: (monotonic vreme, redni broj, skripta, izlazi)
+    # one_cycle već filtrira nepostojeće skripte kroz scandir snapshot —
+    # ovde nema ponovnih stat() provera
+    now_mono = time.monotonic()
+    to_launch = [
+        (now_mono + i * START_DELAY_SEC, idx, script, outputs)
+        for i, (idx, (script, outputs)) in enumerate(enumerate(scrapers, start=1))
+    ]
+
+    sel = selectors.DefaultSelector()
+
+    def _launch(idx: int, script: Path, outputs: List[Path]) -> None:
+        log.info(f"[*] START {idx}/{len(scrapers)}: {script}")
         try:
-            stdout, stderr = p.communicate(timeout=TIMEOUT_EACH)
-        except subprocess.TimeoutExpired:
-            p.kill()
-            stdout, stderr = p.communicate()
-            print(f"[!] TIMEOUT: {script}")
-
+            # izlaz ide direktno u logs/<skripta>.out — kernel piše na disk bez
+            # kopiranja kroz pipe i bez rizika da dete zaglavi na punom baferu;
+            # nova sesija: kill na timeout obara i unuke koje je scraper forkovao
+            out_f = open(f"logs/{script.name}.out", "wb")
+            try:
+                p = subprocess.Popen(
+                    [PY, str(script)],
+                    stdout=out_f, stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                )
+            finally:
+                out_f.close()   # dete drži svoj dup() fd
+        except Exception as e:
+            log.info(f"[!] Greška pri startovanju {script}: {e}")
+            return
+        # blaži prioritet za celu grupu deteta (pgid == pid zbog nove sesije):
+        # Chromium start ne sme da uguši orkestrator i njegov selektor
+        if hasattr(os, "setpriority"):
+            try:
+                os.setpriority(os.PRIO_PGRP, p.pid, 5)
+            except OSError:
+                pass
+        procs[script] = p
+        starts[script] = time.time()
+        outputs_map[script] = outputs
+        # pidfd u isti selektor: izlazak deteta budi petlju odmah,
+        # bez čekanja na sledeći poll krug (Linux 5.3+)
+        if hasattr(os, "pidfd_open"):
+            try:
+                pfd = os.pidfd_open(p.pid)
+            except OSError:
+                pass
+            else:
+                sel.register(pfd, selectors.EVENT_READ, ("pidfd", script))
+                pidfds[pfd] = script
+
+    # Jedna petlja: startuje dospele skripte i reap-uje procese. Stabilnost
+    # izlaza se proverava ODMAH po izlasku procesa, dok ostali još rade —
+    # faza stabilnosti tako ne produžava kritičnu putanju.
+    timed_out: set = set()
+    completed: set = set()
+    pidfds: Dict[int, Path] = {}
+    pending_watch: Dict[str, Tuple[Path, float]] = {}   # name -> (path, početak tišine)
+    last_event: Dict[str, float] = {}
+    quiet_for = STABILITY_CHECKS * STABILITY_SLEEP
+    # inotify fd ide u ISTI selektor kao pipe-ovi — jedan epoll za ceo ciklus,
+    # pa write eventi bude petlju odmah umesto da se čitaju jednom po iteraciji
+    ino_fd = _inotify_open(_CWD)
+    if ino_fd is not None:
+        sel.register(ino_fd, selectors.EVENT_READ, None)
+
+    def _on_exit(script: Path, p: subprocess.Popen) -> None:
+        """Proces je izašao: zabeleži trajanje i odmah kreni sa proverom izlaza."""
+        completed.add(script)
         duration = time.time() - starts.get(script, time.time())
-        print(f"[TIME] {script} trajanje: {fmt_duration(duration)}")
-        if stdout:
-            print(f"[STDOUT:{script}]\n{stdout.strip()}\n")
-        if stderr:
-            print(f"[STDERR:{script}]\n{stderr.strip()}\n")
-
+        log.info(f"[TIME] {script} trajanje: {fmt_duration(duration)}")
         if p.returncode == 0:
-            print(f"[OK] {script} završen uspešno.")
+            log.info(f"[OK] {script} završen uspešno.")
         else:
-            print(f"[!] {script} exit code: {p.returncode}")
-
-        # (opciono) stabilnost izlaza svakog pojedinačno nakon završetka
+            log.info(f"[!] {script} exit code: {p.returncode}")
+            _tail_log(script.name)
+        clean = p.returncode == 0 and script not in timed_out
         for outp in outputs_map.get(script, []):
-            wait_for_file_stable(outp)
+            if clean:
+                # pisac je gotov — dovoljan jedan stat()
+                try:
+                    size = outp.stat().st_size
+                except OSError:
+                    log.info(f"[!] Fajl {outp} nije nastao u roku.")
+                    continue
+                if size >= MIN_BYTES:
+                    log.info(f"[OK] Fajl {outp} je stabilan ({size} bytes).")
+                else:
+                    log.info(f"[!] Fajl {outp} je premali ({size} < {MIN_BYTES}). Preskačem.")
+            elif ino_fd is not None:
+                pending_watch[outp.name] = (outp, time.time())
+
+    while True:
+        mono = time.monotonic()
+        # 1) startuj sve kojima je došlo vreme (uz MAX_CONCURRENT limit)
+        while to_launch and to_launch[0][0] <= mono:
+            if sum(1 for p in procs.values() if p.poll() is None) >= MAX_CONCURRENT:
+                break
+            _, idx, script, outputs = to_launch.pop(0)
+            _launch(idx, script, outputs)
+
+        still_running = any(p.poll() is None for p in procs.values())
+        if not to_launch and not still_running:
+            break
+
+        # 2) ubij procese koji su probili svoj TIMEOUT_EACH; reap-uj završene
+        now = time.time()
+        for script, p in procs.items():
+            if p.poll() is None:
+                if now > starts[script] + TIMEOUT_EACH and script not in timed_out:
+                    _kill_group(p)
+                    timed_out.add(script)
+                    log.info(f"[!] TIMEOUT: {script}")
+            elif script not in completed:
+                _on_exit(script, p)
+
+        # 3) proveri da li je nekom nadgledanom fajlu istekla tišina
+        #    (last_event ažuriraju inotify eventi iz select petlje ispod)
+        if pending_watch:
+            for name in list(pending_watch):
+                pth, since = pending_watch[name]
+                if now - max(since, last_event.get(name, 0.0)) >= quiet_for:
+                    try:
+                        size = pth.stat().st_size
+                    except OSError:
+                        size = -1
+                    if size >= MIN_BYTES:
+                        log.info(f"[OK] Fajl {pth} je stabilan ({size} bytes).")
+                        del pending_watch[name]
+                    # premali/nepostojeći ostaje pod nadzorom do kraja petlje
+
+        # 4) čekaj na izlaze — najviše do sledećeg zakazanog starta.
+        # Ako je sledeći start već dospeo ali ga koči MAX_CONCURRENT, NE spuštaj
+        # timeout na 0 (to bi vrtelo select u prazno) — pidfd ionako budi petlju
+        # čim neko dete izađe i oslobodi slot.
+        timeout = 1.0
+        if to_launch:
+            until_next = to_launch[0][0] - time.monotonic()
+            if until_next > 0:
+                timeout = min(timeout, until_next)
+        if sel.get_map():
+            for key, _ in sel.select(timeout=timeout):
+                if key.data is None:
+                    for name in _inotify_read_names(ino_fd):
+                        if name in pending_watch:
+                            last_event[name] = time.time()
+                    continue
+                if isinstance(key.data, tuple):
+                    # pidfd: dete je izašlo — reap-uj odmah
+                    pfd = key.fileobj
+                    script = key.data[1]
+                    sel.unregister(pfd)
+                    os.close(pfd)
+                    pidfds.pop(pfd, None)
+                    p = procs.get(script)
+                    if p is not None and p.poll() is not None and script not in completed:
+                        _on_exit(script, p)
+                    continue
+        elif still_running or to_launch:
+            time.sleep(min(0.2, timeout) if timeout > 0 else 0.05)
+    sel.close()
+    for pfd in pidfds:
+        try:
+            os.close(pfd)
+        except OSError:
+            pass
+    if ino_fd is not None:
+        os.close(ino_fd)
+
+    for script, p in procs.items():
+        p.wait()
+        if script not in completed:
+            _on_exit(script, p)
+
+    # ono što do kraja petlje nije postalo stabilno (ili inotify ne radi)
+    # dovrši klasičan batch watcher
+    leftovers = [pth for pth, _ in pending_watch.values()]
+    if ino_fd is None:
+        leftovers = [
+            outp
+            for script, p in procs.items()
+            if p.returncode != 0 or script in timed_out
+            for outp in outputs_map.get(script, [])
+        ]
+    if leftovers:
+        wait_for_files_stable(leftovers)
 
 
 # =========== Main (spajanje) ===========
 def run_main() -> int:
-    if not Path(MAIN_SCRIPT).exists():
+    """
+    Pokreni proba.py sa izlazom direktno u logs/proba.py.out — bez pipe-a,
+    bez kopija kroz userspace i bez mogućnosti da dete zaglavi na punom
+    baferu. Rep loga se ispisuje samo pri grešci; timeout obara celu grupu.
+    """
+    if not _MAIN_SCRIPT_PATH.exists():
         print(f"[!] Nema {MAIN_SCRIPT} — preskačem.")
         return 1
     
     print(f"\n[*] Pokrećem {MAIN_SCRIPT}...")
     start_t = time.time()
     try:
-        p = subprocess.Popen([PY, MAIN_SCRIPT], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        stdout, stderr = p.communicate(timeout=20 * 60)
+        out_f = open(f"logs/{MAIN_SCRIPT}.out", "wb")
+        try:
+            p = subprocess.Popen(
+                [PY, MAIN_SCRIPT],
+                stdout=out_f, stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+        finally:
+            out_f.close()
+    except Exception as e:
         duration = time.time() - start_t
-        print(f"[TIME] {MAIN_SCRIPT} trajanje: {fmt_duration(duration)}")
+        print(f"[TIME] {MAIN_SCRIPT} trajanje do greške: {fmt_duration(duration)}")
+        print(f"[!] Greška pri pokretanju {MAIN_SCRIPT}: {e}")
+        return -1
 
-        if stdout:
-            print(f"[STDOUT:{MAIN_SCRIPT}]\n{stdout.strip()}\n")
-        if stderr:
-            print(f"[STDERR:{MAIN_SCRIPT}]\n{stderr.strip()}\n")
-        
-        if p.returncode == 0:
-            print(f"[OK] {MAIN_SCRIPT} završen uspešno.")
-        else:
-            print(f"[!] {MAIN_SCRIPT} exit code: {p.returncode}")
-        return p.returncode
-        
+    try:
+        p.wait(timeout=20 * 60)
     except subprocess.TimeoutExpired:
-        p.kill()
-        stdout, stderr = p.communicate()
+        _kill_group(p)
+        p.wait()
         duration = time.time() - start_t
         print(f"[TIME] {MAIN_SCRIPT} trajanje: {fmt_duration(duration)}")
         print(f"[!] TIMEOUT: {MAIN_SCRIPT}")
-        if stdout:
-            print(f"[STDOUT:{MAIN_SCRIPT}]\n{stdout.strip()}\n")
-        if stderr:
-            print(f"[STDERR:{MAIN_SCRIPT}]\n{stderr.strip()}\n")
+        _tail_log(MAIN_SCRIPT)
         return -999
-    except Exception as e:
-        duration = time.time() - start_t
-        print(f"[TIME] {MAIN_SCRIPT} trajanje do greške: {fmt_duration(duration)}")
-        print(f"[!] Greška pri pokretanju {MAIN_SCRIPT}: {e}")
-        return -1
+
+    duration = time.time() - start_t
+    print(f"[TIME] {MAIN_SCRIPT} trajanje: {fmt_duration(duration)}")
+    if p.returncode == 0:
+        print(f"[OK] {MAIN_SCRIPT} završen uspešno.")
+    else:
+        print(f"[!] {MAIN_SCRIPT} exit code: {p.returncode}")
+        _tail_log(MAIN_SCRIPT)
+    return p.returncode
 
 
 # =========== Izveštaj ===========
-def gather_report(scrapers: List[Tuple[str, List[Path]]]) -> str:
-    lines = []
-    now = datetime.now()
-    header = f"Izveštaj od {now.strftime('%Y-%m-%d %H:%M:%S')}"
-    lines.append(header)
-    lines.append("=" * len(header))
-    lines.append("")
-    for script, outs in scrapers:
-        pregled = outs[1] if len(outs) > 1 else None
-        if pregled and pregled.exists():
-            try:
-                content = pregled.read_text(encoding="utf-8", errors="replace")
-                if content.strip():
-                    lines.append(f"\n--- {script} :: {pregled.name} ---\n")
-                    lines.append(content.strip())
-                    lines.append("")
-            except Exception as e:
-                lines.append(f"\n[!] Greška pri čitanju {pregled}: {e}\n")
-    for pth in MAIN_OUTPUTS:
-        if pth.exists():
-            try:
-                content = pth.read_text(encoding="utf-8", errors="replace")
-                if content.strip():
-                    lines.append(f"\n--- MAIN :: {pth.name} ---\n")
-                    lines.append(content.strip())
-                    lines.append("")
-            except Exception as e:
-                lines.append(f"\n[!] Greška pri čitanju {pth}: {e}\n")
-    return "\n".join(lines).rstrip() + "\n"
-
-def write_timestamped_report(report_text: str) -> Path:
-    REPORT_DIR.mkdir(parents=True, exist_ok=True)
-    ts = datetime.now().strftime("%Y-%m-%d_%H-%M")
-    out_path = REPORT_DIR / f"izvestaj_{ts}.txt"
+# (mtime_ns, size) po fajlu iz prošlog ciklusa — nepromenjeni fajlovi se ne čitaju ponovo
+_LAST_SEEN: Dict[str, Tuple[int, int]] = {}
+
+def _snapshot_cwd() -> Dict[str, os.stat_result]:
+    """Jedan scandir() radnog direktorijuma umesto exists()/stat() po fajlu."""
+    try:
+        return {e.name: e.stat() for e in os.scandir(".")}
+    except OSError:
+        return {}
+
+def _unchanged_since_last_cycle(path: Path, st: Optional[os.stat_result] = None) -> bool:
+    if st is None:
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+    sig = (st.st_mtime_ns, st.st_size)
+    if _LAST_SEEN.get(str(path)) == sig:
+        return True
+    _LAST_SEEN[str(path)] = sig
+    return False
+
+def _copy_into(dst, src_path: Path, size: int) -> None:
+    """Prelij sadržaj fajla u otvoreni (nebaferovani) izlaz — copy_file_range
+    kopira u kernelu bez prolaska kroz Python str/bytes."""
+    with open(src_path, "rb") as s:
+        if hasattr(os, "copy_file_range"):
+            remaining = size
+            while remaining > 0:
+                n = os.copy_file_range(s.fileno(), dst.fileno(), remaining)
+                if n == 0:
+                    break
+                remaining -= n
+        else:
+            shutil.copyfileobj(s, dst)
+
+def build_report(
+    out_path: Path,
+    scrapers: List[Tuple[Path, List[Path]]],
+    full_mm: Optional[mmap.mmap] = None,
+    snap: Optional[Dict[str, os.stat_result]] = None,
+    now: Optional[datetime] = None,
+) -> Path:
+    """
+    Sastavi izveštaj direktno u out_path: mali header-i se pišu iz Python-a,
+    a sadržaj pregled fajlova se prelije kernel-side (copy_file_range) umesto
+    read_text + join + write_text kopija.
+    """
+    if snap is None:
+        snap = _snapshot_cwd()
     try:
-        out_path.write_text(report_text, encoding="utf-8")
+        with open(out_path, "wb", buffering=0) as dst:
+            if now is None:
+                now = datetime.now()
+            header = f"Izveštaj od {now.strftime('%Y-%m-%d %H:%M:%S')}"
+            dst.write(f"{header}\n{'=' * len(header)}\n\n".encode("utf-8"))
+
+            for script, outs in scrapers:
+                pregled = outs[1] if len(outs) > 1 else None
+                st = snap.get(pregled.name) if pregled else None
+                if pregled is None or st is None:
+                    continue
+                if st.st_size < MIN_BYTES:
+                    # ispod praga = scraper nije dao podatke; ne vredi ni otvarati
+                    dst.write(f"[skip empty: {pregled.name}]\n".encode("utf-8"))
+                    continue
+                if _unchanged_since_last_cycle(pregled, st):
+                    dst.write(f"\n--- {script} :: {pregled.name} --- (nepromenjeno od prošlog ciklusa)\n".encode("utf-8"))
+                    continue
+                try:
+                    dst.write(f"\n--- {script} :: {pregled.name} ---\n\n".encode("utf-8"))
+                    _copy_into(dst, pregled, st.st_size)
+                    dst.write(b"\n")
+                except Exception as e:
+                    dst.write(f"\n[!] Greška pri čitanju {pregled}: {e}\n".encode("utf-8"))
+
+            for pth in MAIN_OUTPUTS:
+                st = snap.get(pth.name)
+                if st is None:
+                    continue
+                if st.st_size < MIN_BYTES:
+                    dst.write(f"[skip empty: {pth.name}]\n".encode("utf-8"))
+                    continue
+                if _unchanged_since_last_cycle(pth, st):
+                    dst.write(f"\n--- MAIN :: {pth.name} --- (nepromenjeno od prošlog ciklusa)\n".encode("utf-8"))
+                    continue
+                try:
+                    dst.write(f"\n--- MAIN :: {pth.name} ---\n\n".encode("utf-8"))
+                    if full_mm is not None and pth == TARGET_PUSH:
+                        # fajl je već mapiran u one_cycle — piši direktno iz mape
+                        dst.write(full_mm)
+                    else:
+                        _copy_into(dst, pth, st.st_size)
+                    dst.write(b"\n")
+                except Exception as e:
+                    dst.write(f"\n[!] Greška pri čitanju {pth}: {e}\n".encode("utf-8"))
         print(f"[OK] Sačuvan izveštaj: {out_path}")
     except Exception as e:
         print(f"[!] Greška pri čuvanju izveštaja {out_path}: {e}")
@@ -305,33 +770,72 @@ def write_timestamped_report(report_text: str) -> Path:
 # =========== Ciklus ===========
 def one_cycle():
     cycle_start = time.time()
-    scrapers_to_run = [(s, o) for s, o in SCRAPERS if Path(s).exists()]
+    # jedan datetime po ciklusu — isti timestamp za log, commit poruku i izveštaj
+    cycle_time = datetime.now()
+    snap = _snapshot_cwd()
+    scrapers_to_run = [(s, o) for s, o in SCRAPERS if s.name in snap]
     if not scrapers_to_run:
         print("[!] Nema dostupnih scraper skripti!")
         return
     
     print(f"\n{'='*60}")
-    print(f"NOVI CIKLUS: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"NOVI CIKLUS: {cycle_time.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}\n")
     
     print(f"[*] Pokrećem {len(scrapers_to_run)} skripti sa pauzom {START_DELAY_SEC}s između STARTOVA...")
     run_scrapers_staggered(scrapers_to_run)
     
     ret = run_main()
+
+    # Mapiraj TARGET_PUSH jednom: ista mapa služi i za proveru veličine
+    # (proba.py je završio, fajl je zatvoren) i za izveštaj — bez ponovnog čitanja.
+    full_mm: Optional[mmap.mmap] = None
     if ret == 0 and TARGET_PUSH.exists():
+        try:
+            with open(TARGET_PUSH, "rb") as f:
+                full_mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            full_mm = None
+
+    if full_mm is not None:
+        if len(full_mm) >= MIN_BYTES:
+            print(f"\n[*] {TARGET_PUSH} spreman ({len(full_mm)} bytes) — push...")
+            git_push_file(TARGET_PUSH, now=cycle_time)
+        else:
+            print(f"[!] Fajl {TARGET_PUSH} je premali ({len(full_mm)} < {MIN_BYTES}). Preskačem push.")
+    elif ret == 0 and TARGET_PUSH.exists():
         print(f"\n[*] Provera stabilnosti {TARGET_PUSH} pre push-a...")
         if wait_for_file_stable(TARGET_PUSH, min_bytes=MIN_BYTES):
-            git_push_file(TARGET_PUSH)
+            git_push_file(TARGET_PUSH, now=cycle_time)
     elif ret == 0:
         print(f"[git] {TARGET_PUSH} ne postoji — nema šta da se pushuje.")
-    
+
     print("\n[*] Generisanje izveštaja...")
-    report_text = gather_report(scrapers_to_run)
-    write_timestamped_report(report_text)
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = REPORT_DIR / f"izvestaj_{cycle_time.strftime('%Y-%m-%d_%H-%M')}.txt"
+    try:
+        # svež snapshot — scraperi su u međuvremenu pisali izlazne fajlove
+        build_report(out_path, scrapers_to_run, full_mm=full_mm, snap=_snapshot_cwd(), now=cycle_time)
+    finally:
+        if full_mm is not None:
+            full_mm.close()
     
     cycle_duration = time.time() - cycle_start
     print(f"\n[OK] Ciklus završen za {fmt_duration(cycle_duration)}.")
 
+# Event za čistu obustavu — SIGTERM/SIGINT prekidaju i višeminutno čekanje
+# između ciklusa umesto da spavamo do kraja intervala.
+_STOP = threading.Event()
+
+def _install_stop_handlers():
+    def _handler(signum, frame):
+        _STOP.set()
+    try:
+        signal.signal(signal.SIGTERM, _handler)
+        signal.signal(signal.SIGINT, _handler)
+    except (ValueError, OSError):
+        pass  # nije glavni thread / platforma bez signala
+
 def main_loop():
     if CONTINUOUS_MODE:
         print(f"[*] run_all.py — NEPREKIDNI REŽIM")
@@ -339,11 +843,12 @@ def main_loop():
     else:
         print(f"[*] run_all.py — NORMALNI REŽIM")
         print(f"[*] Ciklus: {RUN_EVERY_MIN} min | Prekid: Ctrl+C\n")
-    
+
+    _install_stop_handlers()
     cycle_count = 0
-    while True:
+    while not _STOP.is_set():
         cycle_count += 1
-        start = time.time()
+        cycle_started = time.monotonic()
         try:
             one_cycle()
         except KeyboardInterrupt:
@@ -353,26 +858,31 @@ def main_loop():
             print(f"\n[!] NEOČEKIVANA GREŠKA: {e}")
             import traceback
             traceback.print_exc()
-        
-        elapsed = time.time() - start
+
+        elapsed = time.monotonic() - cycle_started
         if CONTINUOUS_MODE:
             cooldown = 10
             print(f"\n[*] Ciklus #{cycle_count} trajanje: {fmt_duration(elapsed)}")
             print(f"[*] Kratka pauza ({cooldown}s) pa sledeći ciklus...")
             print(f"{'='*60}\n")
-            time.sleep(cooldown)
+            if _STOP.wait(timeout=cooldown):
+                break
         else:
-            sleep_sec = max(0, RUN_EVERY_MIN * 60 - elapsed)
+            # deadline na monotonic satu — zidni sat ne može da produži ciklus
+            sleep_sec = max(0.0, (cycle_started + RUN_EVERY_MIN * 60) - time.monotonic())
             if sleep_sec > 0:
                 mins = int(sleep_sec // 60)
                 secs = int(sleep_sec % 60)
                 print(f"\n[*] Ciklus #{cycle_count} trajanje: {fmt_duration(elapsed)}")
                 print(f"[*] Sledeći ciklus za {mins} min {secs} sek.")
                 print(f"{'='*60}\n")
-                time.sleep(sleep_sec)
+                if _STOP.wait(timeout=sleep_sec):
+                    break
             else:
                 print(f"\n[*] Ciklus duži od intervala — pokrećem odmah...")
                 print(f"{'='*60}\n")
+    if _STOP.is_set():
+        print("\n[!] Primljen signal za prekid. Izlazim.")
 if __name__ == "__main__":
     print(f"[*] run_all.py — JEDNOKRATNI REŽIM (za GitHub Actions)")
     print(f"[*] START-ovi sekvencijalno, pauza {START_DELAY_SEC}s (ne čeka se završetak)\n")
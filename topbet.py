@@ -1,7 +1,7 @@
 # topbet_scrape_parse.py
 # -*- coding: utf-8 -*-
 #
-# Otvori TopBet → KLIK "SVE" → fokus → skrol 30x (robustan) → fokus → Ctrl+A/C → RAW
+# Otvori TopBet → KLIK "SVE" → skrol 30x (robustan) → body.inner_text() → RAW
 # → parsiraj u soccer-like pregled (1/X/2 popunjeni).
 #
 # Pokretanje:
@@ -9,16 +9,21 @@
 #   playwright install
 #   python topbet_scrape_parse.py
 
+import os
 import re
 import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Optional
 from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
 
 URL        = "https://www.topbet.rs/sportsko-kladjenje/1-offer/3-fudbal"
 ORIGIN     = "https://www.topbet.rs"
 RAW_TXT    = Path("topbet_sledeci_mecevi.txt")
 PRETTY_TXT = Path("topbet_mecevi_pregled.txt")
+# trajni Chromium profil — HTTP keš, DNS i cookie odluke prežive run,
+# pa accept_cookies na drugom pokretanju odmah prolazi
+USER_DATA_DIR = Path.home() / ".cache" / "topbet_profile"
 
 # ===========================
 #  A) KOPIRANJE (Playwright)
@@ -96,14 +101,30 @@ def click_center(page):
 def robust_scroll_30(page, pause=0.25):
     """
     Robusno skrolovanje vidljivo u headless=False:
-      - fokus na centar
-      - combine: mouse.wheel, window.scrollBy, PageDown fallback
+      - prvo pokušaj: cela petlja od 30 koraka u JEDNOM page.evaluate — browser
+        sam tempira skrolove, Python blokira jednom umesto 30 CDP round-trip-ova
+      - fallback: mouse.wheel, window.scrollBy, PageDown kombinacija po koraku
       - proverava rast document.body.scrollHeight; ako je „zapeo“, prodrma fokus i ponovi
     """
+    try:
+        page.evaluate(
+            """async (pauseMs) => {
+                window.scrollTo(0, 0);
+                for (let k = 0; k < 30; k++) {
+                    window.scrollBy(0, Math.max(window.innerHeight, 700));
+                    await new Promise(r => setTimeout(r, pauseMs));
+                }
+            }""",
+            int(pause * 1000),
+        )
+        print("[scroll] 30 koraka odrađeno u browseru (jedan evaluate)")
+        return
+    except Exception:
+        pass
+
     # idi na vrh prvo
     try: page.evaluate("window.scrollTo(0,0)")
     except Exception: pass
-    wait_idle(page, 600)
     click_center(page)
 
     get_h = lambda: page.evaluate("() => document.body.scrollHeight")
@@ -118,8 +139,9 @@ def robust_scroll_30(page, pause=0.25):
         except Exception:
             pass
 
+        # bez wait_idle po koraku — 30 CDP round-trip-ova manje; time.sleep(pause)
+        # je dovoljan da lazy-load stigne (networkidle se čeka samo posle goto-a)
         time.sleep(pause)
-        wait_idle(page, int(pause*1000))
 
         new_h = get_h()
         advanced = new_h > last_h + 5
@@ -131,7 +153,6 @@ def robust_scroll_30(page, pause=0.25):
             except Exception:
                 pass
             time.sleep(pause)
-            wait_idle(page, int(pause*1000))
             new_h = get_h()
             advanced = new_h > last_h + 5
 
@@ -142,7 +163,6 @@ def robust_scroll_30(page, pause=0.25):
             except Exception:
                 pass
             time.sleep(pause)
-            wait_idle(page, int(pause*1000))
             new_h = get_h()
             advanced = new_h > last_h + 5
 
@@ -154,7 +174,6 @@ def robust_scroll_30(page, pause=0.25):
             except Exception:
                 pass
             time.sleep(pause)
-            wait_idle(page, int(pause*1000))
             new_h = get_h()
             advanced = new_h > last_h + 5
 
@@ -162,32 +181,8 @@ def robust_scroll_30(page, pause=0.25):
         print(f"[scroll] step {step:02d}/30  advanced={advanced}")
 
 def copy_all(page) -> str:
-    click_center(page)
-    try:
-        page.keyboard.press("Control+A")
-        time.sleep(0.8)
-        page.keyboard.press("Control+C")
-    except Exception:
-        pass
-
-    time.sleep(0.25)
-    try:
-        page.keyboard.press("Meta+A")
-        time.sleep(0.8)
-        page.keyboard.press("Meta+C")
-    except Exception:
-        pass
-
-    time.sleep(0.3)
-    try:
-        txt = page.evaluate(
-            "() => navigator.clipboard && navigator.clipboard.readText ? navigator.clipboard.readText() : ''"
-        )
-        if isinstance(txt, str) and txt.strip():
-            return txt
-    except Exception:
-        pass
-
+    # inner_text vraća isti vidljivi tekst kao select+copy, bez clipboard
+    # permisija i fiksnih sleep-ova — Ctrl+A/C ceremonija je izbačena
     try:
         return page.locator("body").inner_text()
     except Exception:
@@ -196,19 +191,16 @@ def copy_all(page) -> str:
 def fetch_raw_topbet(headless: bool = False) -> str:
     """Otvori TopBet, klik 'SVE' → robust scroll 30 → kopiraj → vrati tekst i upiši RAW."""
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless)
-        context = browser.new_context(
+        USER_DATA_DIR.mkdir(parents=True, exist_ok=True)
+        context = p.chromium.launch_persistent_context(
+            str(USER_DATA_DIR),
+            headless=headless,
             locale="sr-RS",
-            permissions=["clipboard-read", "clipboard-write"],
             user_agent=("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36"),
             viewport={"width": 1440, "height": 1100},
         )
-        try:
-            context.grant_permissions(["clipboard-read", "clipboard-write"], origin=ORIGIN)
-        except Exception:
-            pass
 
-        page = context.new_page()
+        page = context.pages[0] if context.pages else context.new_page()
         try:
             page.goto(URL, wait_until="domcontentloaded", timeout=60000)
             accept_cookies(page)
@@ -230,51 +222,71 @@ def fetch_raw_topbet(headless: bool = False) -> str:
             print(f"[OK] RAW sačuvan: {RAW_TXT.resolve()}")
             return txt
         finally:
-            browser.close()
+            context.close()
 
 # ===========================
 #  B) PARSER (TopBet RAW → Pretty)
 # ===========================
 
-TIME_RE       = re.compile(r"^([01]?\d|2[0-3]):[0-5]\d$")
-PLUS_ID_RE    = re.compile(r"^\+\d+$")
-FLOAT_RE      = re.compile(r"^\d+(?:[.,]\d+)?$")
-DAY_HEAD_RE   = re.compile(r"^(PON|UTO|SRE|ČET|CET|PET|SUB|NED)\.\s+(\d{1,2}\.\d{1,2}\.)$", re.I)
-
-SKIP_TOKENS = {
+# Jedan spojen regex umesto 4 pojedinačna po liniji — klasa linije se čita
+# iz m.lastgroup, pa je po liniji jedan prolaz kroz regex mašinu.
+LINE_KIND   = re.compile(
+    r"(?P<time>(?:[01]?\d|2[0-3]):[0-5]\d$)"
+    r"|(?P<plus>\+\d+$)"
+    r"|(?P<float>\d+(?:[.,]\d+)?$)"
+    r"|(?P<day>(?:PON|UTO|SRE|ČET|CET|PET|SUB|NED)\.\s+\d{1,2}\.\d{1,2}\.$)",
+    re.I,
+)
+# zadržan zbog izvlačenja grupa (dan, datum) — pogađa samo header linije
+DAY_HEAD_RE = re.compile(r"^(PON|UTO|SRE|ČET|CET|PET|SUB|NED)\.\s+(\d{1,2}\.\d{1,2}\.)$", re.I)
+
+SKIP_TOKENS = frozenset({
     "Fudbal",
     "KONAČAN ISHOD", "UKUPNO GOLOVA", "OBA TIMA DAJU GOL",
     "KONACAN ISHOD", "UKUPNO GOLOVA 2.5",
     "1", "X", "2",
     "Tiket (0)",
-}
+})
 
 DAY_CANON = {
     "PON": "Pon", "UTO": "Uto", "SRE": "Sre", "ČET": "Čet", "CET": "Čet",
     "PET": "Pet", "SUB": "Sub", "NED": "Ned",
 }
 
+@dataclass(slots=True)
+class Match:
+    """Jedan meč — slotted objekat umesto dict-of-dicts po meču."""
+    time: str
+    day: str
+    date: str
+    league: str
+    home: str
+    away: str
+    match_id: str
+    q1: Optional[float]
+    qx: Optional[float]
+    q2: Optional[float]
+
 def _to_float(s: str) -> Optional[float]:
-    s = s.strip().replace(",", ".")
+    # linije su već strip-ovane (float prašta i okolni whitespace);
+    # novi string se pravi samo kad zaista ima zareza
     try:
+        if "," in s:
+            s = s.replace(",", ".")
         return float(s)
     except Exception:
         return None
 
-def is_league_line(s: str) -> bool:
-    if not s: return False
-    if " - " in s: return False
-    if TIME_RE.match(s): return False
-    if PLUS_ID_RE.match(s): return False
-    if FLOAT_RE.match(s): return False
-    if s in SKIP_TOKENS: return False
-    return True
+_NBSP_TABLE = str.maketrans({"\xa0": " "})
 
-def parse_topbet(text: str) -> List[Dict]:
-    lines = [ln.strip().replace("\xa0", " ") for ln in text.splitlines()]
-    lines = [ln for ln in lines if ln]
+def parse_topbet(text: str) -> List[Match]:
+    # NBSP → space jednim C-level prolazom preko celog teksta,
+    # pa strip+filter praznih u jednoj komprehensiji
+    text = text.translate(_NBSP_TABLE)
+    lines = [s for ln in text.splitlines() if (s := ln.strip())]
 
-    out: List[Dict] = []
+    out: List[Match] = []
+    out_append = out.append
     cur_league = ""
     cur_day = ""
     cur_date = ""
@@ -286,28 +298,33 @@ def parse_topbet(text: str) -> List[Dict]:
         if ln in SKIP_TOKENS:
             i += 1; continue
 
-        mday = DAY_HEAD_RE.match(ln)
-        if mday:
+        m = LINE_KIND.match(ln)
+        kind = m.lastgroup if m else None
+
+        if kind == "day":
+            mday = DAY_HEAD_RE.match(ln)
             cur_day  = DAY_CANON[mday.group(1).upper()]
             cur_date = mday.group(2)
             i += 1
             continue
 
-        if is_league_line(ln):
+        if kind is None and " - " not in ln:
             cur_league = ln
             i += 1
             continue
 
-        if TIME_RE.match(ln):
+        if kind == "time":
             time_s = ln
             i += 1
             if i >= n: break
 
-            if " - " not in lines[i]:
-                i += 1
+            # partition: jedan prolaz kroz string i za test i za split
+            home, sep, away = lines[i].partition(" - ")
+            i += 1
+            if not sep:
                 continue
-            teams_line = lines[i]; i += 1
-            home, away = [t.strip(" .") for t in teams_line.split(" - ", 1)]
+            home = home.strip(" .")
+            away = away.strip(" .")
 
             if i + 2 >= n: break
             q1 = _to_float(lines[i]);   i += 1
@@ -315,50 +332,47 @@ def parse_topbet(text: str) -> List[Dict]:
             q2 = _to_float(lines[i]);   i += 1
 
             match_id = ""
-            if i < n and PLUS_ID_RE.match(lines[i]):
-                match_id = lines[i][1:]
-                i += 1
-
-            out.append({
-                "time":   time_s,
-                "day":    cur_day,
-                "date":   cur_date,
-                "league": cur_league,
-                "home":   home,
-                "away":   away,
-                "match_id": match_id,
-                "odds": {
-                    "1": q1, "X": qx, "2": q2,
-                    "0-2": None, "2+": None, "3+": None,
-                    "GG": None, "IGG": None, "GG&3+": None
-                }
-            })
+            if i < n:
+                mm = LINE_KIND.match(lines[i])
+                if mm and mm.lastgroup == "plus":
+                    match_id = lines[i][1:]
+                    i += 1
+
+            out_append(Match(time_s, cur_day, cur_date, cur_league,
+                             home, away, match_id, q1, qx, q2))
             continue
 
         i += 1
 
     return out
 
-def write_pretty(blocks: List[Dict], out_path: Path):
+SEP = b"=" * 70 + b"\n"
+
+def write_pretty(blocks: List[Match], out_path: Path):
     def fmt(x: Optional[float]) -> str:
         if x is None: return "-"
         return str(int(x)) if float(x).is_integer() else f"{x}"
 
-    lines: List[str] = []
+    # ceo blok se formatira i enkodira odjednom — bez međuliste str linija
+    # i bez ponovnog enkodiranja u write_text; na kraju jedan write() syscall
+    # (ostali marketi se ne skidaju sa TopBet-a, pa su njihove linije konstanta)
+    parts: List[bytes] = []
     for b in blocks:
-        lines.append("=" * 70)
-        header = f"{b['time']}  {b.get('day','')}  {b.get('date','')}".rstrip()
-        league_tag = f"  [{b['league']}]" if b.get("league") else ""
-        lines.append(header + league_tag)
-
-        id_part = f"   (ID: {b['match_id']})" if b.get("match_id") else ""
-        lines.append(f"{b['home']}  vs  {b['away']}{id_part}")
-
-        od = b["odds"]
-        lines.append(f"1={fmt(od.get('1'))}   X={fmt(od.get('X'))}   2={fmt(od.get('2'))}")
-        lines.append(f"0-2={fmt(od.get('0-2'))}   2+={fmt(od.get('2+'))}   3+={fmt(od.get('3+'))}")
-        lines.append(f"GG={fmt(od.get('GG'))}   IGG={fmt(od.get('IGG'))}   GG&3+={fmt(od.get('GG&3+'))}")
-    out_path.write_text("\n".join(lines), encoding="utf-8")
+        header = f"{b.time}  {b.day}  {b.date}".rstrip()
+        league_tag = f"  [{b.league}]" if b.league else ""
+        id_part = f"   (ID: {b.match_id})" if b.match_id else ""
+        parts.append(SEP + (
+            f"{header}{league_tag}\n"
+            f"{b.home}  vs  {b.away}{id_part}\n"
+            f"1={fmt(b.q1)}   X={fmt(b.qx)}   2={fmt(b.q2)}\n"
+            "0-2=-   2+=-   3+=-\n"
+            "GG=-   IGG=-   GG&3+=-"
+        ).encode("utf-8"))
+    fd = os.open(out_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, b"\n".join(parts))
+    finally:
+        os.close(fd)
     print(f"[OK] Pretty sačuvan: {out_path.resolve()}")
 
 # ===========================